@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+
+# Fracción del límite de concurrencia que puede ocupar cada prioridad.
+# Las peticiones menos importantes se rechazan antes cuando la base de datos se satura.
+PRIORIDADES = {
+    "critica": 1.0,     # /health
+    "lectura": 0.9,     # GET
+    "escritura": 0.6,   # POST, PUT, DELETE individuales
+    "masiva": 0.25      # delete-all
+}
+
+# Plazas del límite que cada prioridad deja siempre libres para las de mayor prioridad
+RESERVAS = {
+    "critica": 0,
+    "lectura": 1,
+    "escritura": 2,
+    "masiva": 3
+}
+
+# Múltiplo de la latencia objetivo tolerado por prioridad: un delete-all es lento por naturaleza
+FACTORES_LATENCIA = {
+    "critica": 1,
+    "lectura": 1,
+    "escritura": 2,
+    "masiva": 20
+}
+
+class ControlAdmision:
+    """Límite de concurrencia adaptativo (AIMD) según la latencia observada de la base de datos"""
+
+    def __init__(
+        self,
+        limite_maximo: int,
+        limite_minimo: int = 4,
+        latencia_objetivo: float = 0.5,
+        ventana: float = 1.0,
+        retry_after_minimo: int = 1,
+        retry_after_maximo: int = 30,
+        reloj=time.monotonic
+    ):
+        self.limite_maximo = limite_maximo
+        self.limite_minimo = min(limite_minimo, limite_maximo)
+        self.latencia_objetivo = latencia_objetivo
+        self.ventana = ventana
+        self.retry_after_minimo = retry_after_minimo
+        self.retry_after_maximo = retry_after_maximo
+        self.limite = float(limite_maximo)
+        self.en_curso = 0
+        self.latencia_media = 0.0
+        self._reloj = reloj
+        self._ultimo_recorte = None
+        self._lock = threading.Lock()
+
+    def cupo(self, prioridad: str) -> float:
+        """Número máximo de peticiones en curso con el que aún se admite esta prioridad"""
+        if prioridad == "masiva" and self.limite <= self.limite_minimo:
+            return 0
+        return min(self.limite * PRIORIDADES[prioridad], self.limite - RESERVAS[prioridad])
+
+    def intentar_admitir(self, prioridad: str) -> bool:
+        with self._lock:
+            if self.en_curso >= self.cupo(prioridad):
+                return False
+            self.en_curso += 1
+            return True
+
+    def liberar(self, latencia: float, prioridad: str = "lectura", fallo: bool = False):
+        """Devuelve la plaza; `latencia` es el tiempo pasado en la base de datos"""
+        with self._lock:
+            # Nunca por debajo de cero: una liberación de más no debe ampliar la capacidad
+            self.en_curso = max(0, self.en_curso - 1)
+            if fallo:
+                # Una petición fallida no es una muestra de latencia ni justifica aumentar el límite
+                return
+            self.latencia_media = 0.8 * self.latencia_media + 0.2 * latencia
+            if latencia > self.latencia_objetivo * FACTORES_LATENCIA[prioridad]:
+                # Disminución multiplicativa: la base de datos está respondiendo lento
+                self._recortar(0.9)
+            else:
+                # Aumento aditivo: aproximadamente +1 por cada ventana completa de peticiones
+                self.limite = min(self.limite_maximo, self.limite + 1 / self.limite)
+
+    def registrar_sobrecarga(self):
+        """Se llama cuando no se pudo obtener una conexión o una sentencia superó su statement_timeout"""
+        with self._lock:
+            self._recortar(0.5)
+
+    def _recortar(self, factor: float):
+        # Como máximo un recorte por ventana: una ráfaga de respuestas lentas cuenta una sola vez
+        ahora = self._reloj()
+        if self._ultimo_recorte is not None and ahora - self._ultimo_recorte < self.ventana:
+            return
+        self._ultimo_recorte = ahora
+        self.limite = max(self.limite_minimo, self.limite * factor)
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos al cliente, mayores cuanto más lejos está el límite de su máximo"""
+        rango = self.limite_maximo - self.limite_minimo
+        recorte = (self.limite_maximo - self.limite) / rango if rango > 0 else 0.0
+        segundos = self.retry_after_minimo + recorte * (self.retry_after_maximo - self.retry_after_minimo)
+        segundos = max(segundos, self.latencia_media)
+        return int(min(self.retry_after_maximo, max(self.retry_after_minimo, math.ceil(segundos))))
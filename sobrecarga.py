@@ -0,0 +1,108 @@
+import logging
+import time
+
+from fastapi import HTTPException, Request
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from admision import ControlAdmision
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE de PostgreSQL para una sentencia cancelada por statement_timeout
+PGCODE_QUERY_CANCELED = "57014"
+
+def error_sobrecarga(control: ControlAdmision, detalle: str) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=detalle,
+        headers={"Retry-After": str(control.retry_after())}
+    )
+
+def clasificar_peticion(request: Request) -> str:
+    """Determina la prioridad de la petición a partir de su ruta y método"""
+    ruta = request.url.path
+    if ruta == "/health":
+        return "critica"
+    if ruta.endswith("/admin/delete-all"):
+        return "masiva"
+    if request.method == "GET":
+        return "lectura"
+    return "escritura"
+
+def es_timeout_de_sentencia(error: OperationalError) -> bool:
+    return getattr(error.orig, "pgcode", None) == PGCODE_QUERY_CANCELED
+
+class SesionControlada(Session):
+    """Sesión que pasa por el control de admisión antes de usar la base de datos.
+
+    La plaza y la conexión se reservan en la primera consulta o commit, así las peticiones
+    que terminan en 401, 422 o 400 nunca consumen capacidad.
+    """
+
+    def __init__(self, *args, control: ControlAdmision = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.control = control
+
+    def execute(self, *args, **kwargs):
+        return self._usar_base_de_datos(super().execute, *args, **kwargs)
+
+    def commit(self):
+        self._usar_base_de_datos(super().commit)
+        # Desde aquí los fallos no devuelven 503: el cliente repetiría una escritura ya hecha
+        self.info["escrito"] = True
+
+    def _registrar_fallo(self):
+        self.info["fallo"] = True
+        self.control.registrar_sobrecarga()
+
+    def _reservar(self):
+        prioridad = self.info["prioridad"]
+        if "admitido_en" not in self.info:
+            if not self.control.intentar_admitir(prioridad):
+                logger.warning(f"Petición rechazada por sobrecarga ({prioridad})")
+                raise error_sobrecarga(self.control, "Servicio sobrecargado, intente de nuevo más tarde")
+            self.info["admitido_en"] = time.monotonic()
+        try:
+            # Reutiliza la conexión si la transacción ya tiene una
+            self.connection()
+        except (PoolTimeoutError, OperationalError) as e:
+            # Pool agotado, conexión rechazada o "too many connections" en el pre-ping
+            self._registrar_fallo()
+            if self.info.get("escrito"):
+                raise
+            logger.warning(f"No se pudo obtener conexión a la base de datos: {e}")
+            raise error_sobrecarga(self.control, "Base de datos saturada, intente de nuevo más tarde") from e
+
+    def _usar_base_de_datos(self, operacion, *args, **kwargs):
+        if self.control is None or "prioridad" not in self.info:
+            return operacion(*args, **kwargs)
+        self._reservar()
+        inicio = time.monotonic()
+        try:
+            return operacion(*args, **kwargs)
+        except OperationalError as e:
+            self.info["fallo"] = True
+            if not es_timeout_de_sentencia(e):
+                raise
+            self.control.registrar_sobrecarga()
+            if self.info.get("escrito"):
+                raise
+            logger.warning(f"Sentencia cancelada por statement_timeout ({self.info['prioridad']})")
+            raise error_sobrecarga(self.control, "Base de datos lenta, intente de nuevo más tarde") from e
+        finally:
+            # Solo el tiempo en la base de datos alimenta el límite, no el envío de la respuesta
+            self.info["tiempo_db"] = self.info.get("tiempo_db", 0.0) + time.monotonic() - inicio
+
+def cerrar_sesion(db: SesionControlada):
+    """Cierra la sesión y devuelve su plaza si la petición llegó a ser admitida"""
+    admitido_en = db.info.get("admitido_en")
+    try:
+        db.close()
+    finally:
+        if admitido_en is not None:
+            db.control.liberar(
+                db.info.get("tiempo_db", 0.0),
+                prioridad=db.info["prioridad"],
+                fallo=db.info.get("fallo", False)
+            )
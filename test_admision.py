@@ -0,0 +1,93 @@
+import unittest
+
+from admision import ControlAdmision
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+class TestControlAdmision(unittest.TestCase):
+    def setUp(self):
+        self.reloj = RelojFalso()
+        self.control = ControlAdmision(limite_maximo=15, limite_minimo=4, reloj=self.reloj)
+
+    def llenar(self, prioridad: str) -> int:
+        admitidas = 0
+        while self.control.intentar_admitir(prioridad):
+            admitidas += 1
+        return admitidas
+
+    def test_admision_por_prioridad(self):
+        self.assertEqual(self.llenar("masiva"), 4)
+        self.assertEqual(self.llenar("escritura"), 5)
+        self.assertEqual(self.llenar("lectura"), 5)
+        self.assertEqual(self.llenar("critica"), 1)
+        self.assertEqual(self.control.en_curso, 15)
+
+    def test_rafaga_lenta_recorta_una_vez_por_ventana(self):
+        for _ in range(14):
+            self.control.intentar_admitir("lectura")
+        for _ in range(14):
+            self.control.liberar(2.0)
+        self.assertAlmostEqual(self.control.limite, 13.5)
+
+        self.reloj.ahora += self.control.ventana
+        self.control.liberar(2.0)
+        self.assertAlmostEqual(self.control.limite, 12.15)
+
+    def test_limite_minimo_reserva_plazas_para_criticas_y_lecturas(self):
+        for _ in range(10):
+            self.control.registrar_sobrecarga()
+            self.reloj.ahora += self.control.ventana
+        self.assertEqual(self.control.limite, 4)
+
+        self.assertFalse(self.control.intentar_admitir("masiva"))
+        self.assertEqual(self.llenar("escritura"), 2)
+        self.assertEqual(self.llenar("lectura"), 1)
+        self.assertTrue(self.control.intentar_admitir("critica"))
+
+    def test_recuperacion_aditiva(self):
+        self.control.registrar_sobrecarga()
+        self.assertEqual(self.control.limite, 7.5)
+        for _ in range(200):
+            self.control.intentar_admitir("lectura")
+            self.control.liberar(0.01)
+        self.assertEqual(self.control.limite, 15)
+
+    def test_liberaciones_fallidas_no_aumentan_el_limite(self):
+        self.control.registrar_sobrecarga()
+        for _ in range(10):
+            self.control.intentar_admitir("lectura")
+            self.control.liberar(0.01, fallo=True)
+        self.assertEqual(self.control.limite, 7.5)
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_objetivo_de_latencia_por_prioridad(self):
+        self.control.intentar_admitir("masiva")
+        self.control.liberar(5.0, prioridad="masiva")
+        self.assertEqual(self.control.limite, 15)
+
+        self.control.intentar_admitir("lectura")
+        self.control.liberar(5.0, prioridad="lectura")
+        self.assertAlmostEqual(self.control.limite, 13.5)
+
+    def test_liberaciones_equilibradas(self):
+        for _ in range(3):
+            self.control.intentar_admitir("lectura")
+        for _ in range(5):
+            self.control.liberar(0.01)
+        self.assertEqual(self.control.en_curso, 0)
+        self.assertEqual(self.llenar("critica"), 15)
+
+    def test_retry_after_crece_con_el_recorte(self):
+        self.assertEqual(self.control.retry_after(), 1)
+        for _ in range(10):
+            self.control.registrar_sobrecarga()
+            self.reloj.ahora += self.control.ventana
+        self.assertEqual(self.control.retry_after(), 30)
+
+if __name__ == "__main__":
+    unittest.main()
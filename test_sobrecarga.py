@@ -0,0 +1,143 @@
+import importlib
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from admision import ControlAdmision
+
+API_KEY = {"X-API-Key": "desarrollo_key_2025"}
+
+class CancelacionPostgres(Exception):
+    """Imita el error de psycopg2 cuando salta statement_timeout"""
+    pgcode = "57014"
+
+def timeout_de_sentencia():
+    return OperationalError("SELECT", {}, CancelacionPostgres("canceling statement due to statement timeout"))
+
+def setUpModule():
+    global main, directorio
+    directorio = tempfile.TemporaryDirectory()
+    ruta_db = os.path.join(directorio.name, "estudiantes.db")
+    crear_engine_real = sqlalchemy.create_engine
+
+    def crear_engine_sqlite(url, **kwargs):
+        # Misma configuración de pool que main.py, pero contra sqlite
+        engine = crear_engine_real(
+            f"sqlite:///{ruta_db}",
+            connect_args={"check_same_thread": False},
+            poolclass=sqlalchemy.pool.QueuePool,
+            **kwargs
+        )
+
+        @event.listens_for(engine, "connect")
+        def information_schema(dbapi_connection, connection_record):
+            dbapi_connection.execute("ATTACH DATABASE ':memory:' AS information_schema")
+            dbapi_connection.execute("CREATE TABLE information_schema.columns (column_name TEXT, table_name TEXT)")
+
+        return engine
+
+    variables = {"DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "0", "DB_POOL_TIMEOUT": "0.1"}
+    with mock.patch.dict(os.environ, variables), mock.patch("sqlalchemy.create_engine", crear_engine_sqlite):
+        sys.modules.pop("main", None)
+        main = importlib.import_module("main")
+
+    # sqlite no entiende SET LOCAL statement_timeout
+    event.remove(main.SessionLocal, "after_begin", main.aplicar_statement_timeout)
+    main.Base.metadata.create_all(main.engine)
+
+def tearDownModule():
+    main.engine.dispose()
+    directorio.cleanup()
+
+class TestSobrecarga(unittest.TestCase):
+    def setUp(self):
+        self.control = ControlAdmision(limite_maximo=15)
+        main.SessionLocal.kw["control"] = self.control
+        self.client = TestClient(main.app)
+
+    def ocupar_pool(self):
+        conexion = main.engine.connect()
+        self.addCleanup(conexion.close)
+        return conexion
+
+    def nueva_sesion(self, prioridad="escritura"):
+        return main.SessionLocal(info={"prioridad": prioridad})
+
+    def test_peticiones_rechazadas_antes_de_consultar_no_ocupan_plaza(self):
+        with mock.patch.object(self.control, "intentar_admitir", wraps=self.control.intentar_admitir) as admitir:
+            respuesta = self.client.get("/estudiantes/", headers={"X-API-Key": "invalida"})
+            self.assertEqual(respuesta.status_code, 401)
+            respuesta = self.client.post("/estudiantes/", json={"nombre": "Ana"}, headers=API_KEY)
+            self.assertEqual(respuesta.status_code, 422)
+            respuesta = self.client.delete("/estudiantes/admin/delete-all", headers=API_KEY)
+            self.assertEqual(respuesta.status_code, 400)
+        admitir.assert_not_called()
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_http_exception_no_se_convierte_en_500(self):
+        respuesta = self.client.get("/estudiantes/999", headers=API_KEY)
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_pool_agotado_responde_503_con_retry_after(self):
+        self.ocupar_pool()
+        respuesta = self.client.get("/estudiantes/", headers=API_KEY)
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertIn("Retry-After", respuesta.headers)
+        self.assertEqual(self.control.limite, 7.5)
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_pool_agotado_en_commit_responde_503(self):
+        self.ocupar_pool()
+        respuesta = self.client.post("/estudiantes/", json={"nombre": "Ana", "edad": 20}, headers=API_KEY)
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertIn("Retry-After", respuesta.headers)
+
+    def test_timeout_de_sentencia_responde_503(self):
+        with mock.patch.object(Session, "execute", side_effect=timeout_de_sentencia()):
+            respuesta = self.client.get("/estudiantes/", headers=API_KEY)
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertIn("Retry-After", respuesta.headers)
+        self.assertEqual(self.control.limite, 7.5)
+
+    def test_fallos_no_aumentan_el_limite(self):
+        self.ocupar_pool()
+        for _ in range(10):
+            self.assertEqual(self.client.get("/estudiantes/", headers=API_KEY).status_code, 503)
+        self.assertEqual(self.control.limite, 7.5)
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_fallo_tras_commit_no_invita_a_reintentar(self):
+        db = self.nueva_sesion()
+        try:
+            estudiante = main.Estudiante(nombre="Ana", edad=20)
+            db.add(estudiante)
+            db.commit()
+            self.ocupar_pool()
+            with self.assertRaises(PoolTimeoutError):
+                db.refresh(estudiante)
+        finally:
+            main.cerrar_sesion(db)
+        self.assertEqual(self.control.en_curso, 0)
+
+    def test_latencia_medida_solo_en_la_base_de_datos(self):
+        db = self.nueva_sesion("lectura")
+        with mock.patch.object(self.control, "liberar", wraps=self.control.liberar) as liberar:
+            db.query(main.Estudiante).count()
+            time.sleep(0.2)
+            main.cerrar_sesion(db)
+        latencia = liberar.call_args.args[0]
+        self.assertLess(latencia, 0.2)
+        self.assertEqual(liberar.call_args.kwargs, {"prioridad": "lectura", "fallo": False})
+
+if __name__ == "__main__":
+    unittest.main()